@@ -1,37 +1,56 @@
 import argparse
+import time
 from typing import List, Dict, Any
 
 import pandas as pd
 import spacy
 
+import instrumentation
+from instrumentation import PARSES, UNMATCHED_SENTENCES, Progress, span, stage
+
 
 # ---------------------
 # CONSTANTS & CONFIG
 # ---------------------
-def get_language_models(df):
-    """Return language models configuration dict after data is loaded."""
-    return {
-        "English": {
-            "df": df[df["language"] == "English"].copy(),
-            "model": "en_core_web_trf",
-            "keyword": df[df["language"] == "English"]["source_word"].iloc[0]
-        },
-        "Spanish": {
-            "df": df[df["language"] == "Spanish"].copy(),
-            "model": "es_dep_news_trf",
-            "keyword": df[df["language"] == "Spanish"]["source_word"].iloc[0]
-        },
-        "Italian": {
-            "df": df[df["language"] == "Italian"].copy(),
-            "model": "it_core_news_lg",
-            "keyword": df[df["language"] == "Italian"]["source_word"].iloc[0]
-        },
-        "German": {
-            "df": df[df["language"] == "German"].copy(),
-            "model": "de_dep_news_trf",
-            "keyword": df[df["language"] == "German"]["source_word"].iloc[0]
+# spaCy pipelines per language, slowest/most accurate first.
+# There is no Italian transformer pipeline, so its "trf" tier is the large model.
+MODEL_TIERS = {
+    "English": {"trf": "en_core_web_trf", "lg": "en_core_web_lg", "md": "en_core_web_md", "sm": "en_core_web_sm"},
+    "Spanish": {"trf": "es_dep_news_trf", "lg": "es_core_news_lg", "md": "es_core_news_md", "sm": "es_core_news_sm"},
+    "Italian": {"trf": "it_core_news_lg", "lg": "it_core_news_lg", "md": "it_core_news_md", "sm": "it_core_news_sm"},
+    "German": {"trf": "de_dep_news_trf", "lg": "de_core_news_lg", "md": "de_core_news_md", "sm": "de_core_news_sm"},
+}
+TIERS = ["trf", "lg", "md", "sm"]
+DEFAULT_TIER = "trf"
+
+
+def get_language_models(df, tiers=None):
+    """Return language models configuration dict after data is loaded.
+
+    `tiers` maps a language name to one of TIERS; languages not listed use DEFAULT_TIER.
+    """
+    tiers = tiers or {}
+    language_models = {}
+    for lang_name, models in MODEL_TIERS.items():
+        df_lang = df[df["language"] == lang_name]
+        tier = tiers.get(lang_name, DEFAULT_TIER)
+        language_models[lang_name] = {
+            "df": df_lang.copy(),
+            "model": models[tier],
+            "tier": tier,
+            "keyword": df_lang["source_word"].iloc[0]
         }
-    }
+    return language_models
+
+
+def load_model(model_name):
+    """Load a spaCy pipeline, pointing at the download command if it is missing."""
+    try:
+        with span("model_load"):
+            return spacy.load(model_name)
+    except OSError as e:
+        raise OSError(f"spaCy model '{model_name}' is not installed. "
+                      f"Run: python -m spacy download {model_name}") from e
 
 
 # ---------------------
@@ -39,8 +58,13 @@ def get_language_models(df):
 # ---------------------
 def analyze_romance_sentence(sentence: str, lang_name: str, keyword: str, nlp, debug=False) -> list[dict]:
     """Analyze Romance language sentences for dependency relationships with keyword."""
+    return analyze_romance_doc(nlp(sentence), lang_name, keyword, debug)
+
+
+def analyze_romance_doc(doc, lang_name: str, keyword: str, debug=False) -> list[dict]:
+    """Analyze an already parsed Romance language Doc (see analyze_romance_sentence)."""
     results = []
-    doc = nlp(sentence)
+    sentence = doc.text
     keyword = keyword.lower()
     keyword_found = False
 
@@ -92,18 +116,20 @@ def analyze_romance_sentence(sentence: str, lang_name: str, keyword: str, nlp, d
             if other.dep_ == "conj" and other.head == token and other.pos_ not in junk_pos:
                 results.append(_result(token, other, other.pos_, sentence, lang_name))
 
-    if debug and not results:
-        if not keyword_found:
-            print(f"X Keyword '{keyword}' not found: {sentence}")
-        else:
-            print(f"X Keyword '{keyword}' no relations: {sentence}")
+    if not results:
+        _record_unmatched(sentence, lang_name, keyword, keyword_found, debug)
     return results
 
 
 def analyze_german_sentence(sentence: str, lang_name: str, keyword: str, nlp, debug=False) -> list[dict]:
     """Analyze German sentences for dependency relationships with keyword."""
+    return analyze_german_doc(nlp(sentence), lang_name, keyword, debug)
+
+
+def analyze_german_doc(doc, lang_name: str, keyword: str, debug=False) -> list[dict]:
+    """Analyze an already parsed German Doc (see analyze_german_sentence)."""
     results = []
-    doc = nlp(sentence)
+    sentence = doc.text
     keyword = keyword.lower()
     keyword_found = False
 
@@ -140,12 +166,19 @@ def analyze_german_sentence(sentence: str, lang_name: str, keyword: str, nlp, de
             if other.dep_ == "conj" and other.head == token and other.pos_ not in junk_pos:
                 results.append(_result(token, other, other.pos_, sentence, lang_name))
 
-    if debug and not results:
+    if not results:
+        _record_unmatched(sentence, lang_name, keyword, keyword_found, debug)
+    return results
+
+
+def _record_unmatched(sentence, lang_name, keyword, keyword_found, debug):
+    reason = "no_relations" if keyword_found else "keyword_not_found"
+    UNMATCHED_SENTENCES.labels(lang_name, reason).inc()
+    if debug:
         if not keyword_found:
             print(f"X Keyword '{keyword}' not found: {sentence}")
         else:
             print(f"X Keyword '{keyword}' no relations: {sentence}")
-    return results
 
 
 def _result(keyword_token, co_word_token, dep_type, sentence, lang_name) -> dict:
@@ -159,6 +192,27 @@ def _result(keyword_token, co_word_token, dep_type, sentence, lang_name) -> dict
     }
 
 
+LANGUAGE_DOC_ANALYZERS = {
+    "German": analyze_german_doc,
+    "English": analyze_romance_doc,
+    "Spanish": analyze_romance_doc,
+    "Italian": analyze_romance_doc,
+}
+
+PARSE_BATCH_SIZE = 64
+
+
+def analyze_batch(sentences, lang_name, keyword, nlp, batch_size=PARSE_BATCH_SIZE, debug=False):
+    """Parse sentences with nlp.pipe and return one list of relations per sentence."""
+    analyze_function = LANGUAGE_DOC_ANALYZERS[lang_name]
+    parses = PARSES.labels(lang_name)
+    batch_results = []
+    for doc in nlp.pipe(sentences, batch_size=batch_size):
+        batch_results.append(analyze_function(doc, lang_name, keyword, debug))
+        parses.inc()
+    return batch_results
+
+
 def load_data(test_mode=False):
     """Load sentence data based on test mode setting."""
     if test_mode:
@@ -168,31 +222,115 @@ def load_data(test_mode=False):
         return pd.read_csv("./outputs/scraped_freedom_sentences.csv")
 
 
-def analyze_sentences(language_models):
+def analyze_sentences(language_models, debug=False):
     """Process all sentences in all configured languages."""
-    language_analyzers = {
-        "German": analyze_german_sentence,
-        "English": analyze_romance_sentence,  
-        "Spanish": analyze_romance_sentence,
-        "Italian": analyze_romance_sentence,
-    }
-    
     results = []
 
     for lang_name, config in language_models.items():
         df_target_lang = config["df"]
-        print(f"Processing: {lang_name} ({len(df_target_lang)})")
+        print(f"Processing: {lang_name} ({len(df_target_lang)}) with {config['model']}")
         
         keyword = config["keyword"]
-        nlp = spacy.load(config["model"])
-        analyze_function = language_analyzers[lang_name]
+        nlp = load_model(config["model"])
+        progress = Progress(f"parse {lang_name}", total=len(df_target_lang))
 
-        for sentence in df_target_lang["sentence"]:
-            results.extend(analyze_function(sentence, lang_name, keyword, nlp, debug=True))
+        for sentence_results in analyze_batch(df_target_lang["sentence"], lang_name, keyword, nlp, debug=debug):
+            results.extend(sentence_results)
+            progress.tick()
+        progress.done()
     
     return results
 
 
+def _relation_keys(results):
+    """Relations as (sentence, co_word, pos, dep_type), so tiers are compared sentence by sentence."""
+    return {(r["sentence"], r["co_word"], r["pos"], r["dep_type"]) for r in results}
+
+
+def _run_tier(sentences, lang_name, keyword, model_name):
+    """Parse sentences with one pipeline and return its timings and relations."""
+    nlp = load_model(model_name)
+
+    start = time.perf_counter()
+    results = [result for sentence_results in analyze_batch(sentences, lang_name, keyword, nlp) for result in sentence_results]
+    seconds = time.perf_counter() - start
+
+    return {
+        "model": model_name,
+        "sentences_per_s": len(sentences) / seconds if seconds else float("nan"),
+        "relations": _relation_keys(results),
+    }
+
+
+def compare_model_tiers(df, tier_a, tier_b, sample_size=200, seed=0):
+    """Run two model tiers over a per-language sample and compare speed and extracted relations.
+
+    Recall/precision treat tier_a as the reference, so pass the slower tier first.
+    """
+    rows = []
+    totals = {"sentences": 0, "a_seconds": 0.0, "b_seconds": 0.0, "a": 0, "b": 0, "shared": 0, "union": 0}
+
+    for lang_name, models in MODEL_TIERS.items():
+        df_lang = df[df["language"] == lang_name]
+        if df_lang.empty:
+            continue
+        sentences = df_lang.sample(n=min(sample_size, len(df_lang)), random_state=seed)["sentence"].tolist()
+        keyword = df_lang["source_word"].iloc[0]
+        print(f"Comparing {lang_name}: {models[tier_a]} vs {models[tier_b]} on {len(sentences)} sentences")
+
+        run_a = _run_tier(sentences, lang_name, keyword, models[tier_a])
+        if models[tier_b] == models[tier_a]:
+            run_b = run_a
+        else:
+            run_b = _run_tier(sentences, lang_name, keyword, models[tier_b])
+
+        a, b = run_a["relations"], run_b["relations"]
+        shared, union = len(a & b), len(a | b)
+        rows.append({
+            "lang_name": lang_name,
+            "sentences": len(sentences),
+            f"{tier_a}_model": run_a["model"],
+            f"{tier_b}_model": run_b["model"],
+            f"{tier_a}_sentences_per_s": round(run_a["sentences_per_s"], 2),
+            f"{tier_b}_sentences_per_s": round(run_b["sentences_per_s"], 2),
+            "speedup": round(run_b["sentences_per_s"] / run_a["sentences_per_s"], 2),
+            f"{tier_a}_relations": len(a),
+            f"{tier_b}_relations": len(b),
+            "shared_relations": shared,
+            "jaccard": round(shared / union, 3) if union else 1.0,
+            f"{tier_b}_recall": round(shared / len(a), 3) if a else 1.0,
+            f"{tier_b}_precision": round(shared / len(b), 3) if b else 1.0,
+        })
+
+        totals["sentences"] += len(sentences)
+        totals["a_seconds"] += len(sentences) / run_a["sentences_per_s"]
+        totals["b_seconds"] += len(sentences) / run_b["sentences_per_s"]
+        totals["a"] += len(a)
+        totals["b"] += len(b)
+        totals["shared"] += shared
+        totals["union"] += union
+
+    if rows:
+        a_rate = totals["sentences"] / totals["a_seconds"]
+        b_rate = totals["sentences"] / totals["b_seconds"]
+        rows.append({
+            "lang_name": "All",
+            "sentences": totals["sentences"],
+            f"{tier_a}_model": "",
+            f"{tier_b}_model": "",
+            f"{tier_a}_sentences_per_s": round(a_rate, 2),
+            f"{tier_b}_sentences_per_s": round(b_rate, 2),
+            "speedup": round(b_rate / a_rate, 2),
+            f"{tier_a}_relations": totals["a"],
+            f"{tier_b}_relations": totals["b"],
+            "shared_relations": totals["shared"],
+            "jaccard": round(totals["shared"] / totals["union"], 3) if totals["union"] else 1.0,
+            f"{tier_b}_recall": round(totals["shared"] / totals["a"], 3) if totals["a"] else 1.0,
+            f"{tier_b}_precision": round(totals["shared"] / totals["b"], 3) if totals["b"] else 1.0,
+        })
+    return pd.DataFrame(rows)
+
+
 def save_results(results):
     """Save analysis results to CSV file."""
     df_dep_analysis_words = pd.DataFrame(results)
@@ -203,23 +341,63 @@ def save_results(results):
 # ---------------------
 # MAIN EXECUTION
 # ---------------------
+def add_tier_arguments(parser):
+    """Add --tier and --lang-tier to a parser; read them back with parse_tiers."""
+    parser.add_argument("--tier", choices=TIERS, default=DEFAULT_TIER, help="spaCy model tier for every language")
+    parser.add_argument("--lang-tier", action="append", default=[], metavar="LANGUAGE=TIER",
+                        help="Override the tier for one language, e.g. German=lg")
+
+
+def parse_tiers(parser, args):
+    """Combine --tier and --lang-tier LANG=TIER overrides into a per-language dict."""
+    tiers = {lang_name: args.tier for lang_name in MODEL_TIERS}
+    for override in args.lang_tier:
+        lang_name, _, tier = override.partition("=")
+        if lang_name not in MODEL_TIERS or tier not in TIERS:
+            parser.error(f"--lang-tier expects LANGUAGE=TIER with LANGUAGE in {list(MODEL_TIERS)} "
+                         f"and TIER in {TIERS}, got '{override}'")
+        tiers[lang_name] = tier
+    return tiers
+
+
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser()
     parser.add_argument("--test", action="store_true", help="Run with test data")
+    parser.add_argument("--debug", action="store_true", help="Print sentences that yield no relations")
+    add_tier_arguments(parser)
+    parser.add_argument("--compare-tiers", nargs=2, choices=TIERS, metavar=("REFERENCE", "CANDIDATE"),
+                        help="Compare two tiers on a sample instead of running the analysis")
+    parser.add_argument("--sample", type=int, default=200, help="Sentences per language for --compare-tiers")
+    instrumentation.add_arguments(parser, "analyze_with_spacy")
     args = parser.parse_args()
+    tiers = parse_tiers(parser, args)
+    if args.compare_tiers and args.compare_tiers[0] == args.compare_tiers[1]:
+        parser.error("--compare-tiers needs two different tiers")
     
-    # Load data
-    df = load_data(args.test)
-    
-    # Get language models configuration
-    language_models = get_language_models(df)
-    
-    # Analyze sentences
-    results = analyze_sentences(language_models)
-    
-    # Save results
-    save_results(results)
+    with instrumentation.instrumented_run("analyze_with_spacy", args.log_file, args.metrics_file, args.metrics_port):
+        # Load data
+        df = load_data(args.test)
+
+        if args.compare_tiers:
+            tier_a, tier_b = args.compare_tiers
+            with stage("compare_tiers"):
+                report = compare_model_tiers(df, tier_a, tier_b, sample_size=args.sample)
+            output_path = f"./outputs/model_tier_comparison_{tier_a}_vs_{tier_b}.csv"
+            report.to_csv(output_path, index=False)
+            print(f"\n{report.to_string(index=False)}\n\nSaved tier comparison to {output_path}")
+            return
+        
+        # Get language models configuration
+        language_models = get_language_models(df, tiers)
+        
+        # Analyze sentences
+        with stage("parse") as timer:
+            results = analyze_sentences(language_models, debug=args.debug)
+            timer.items = len(df)
+        
+        # Save results
+        save_results(results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+"""Shared timing, counters and memory sampling for the pipeline scripts.
+
+All metrics live in one prometheus_client registry, written out as a
+Prometheus text file (and optionally served over HTTP) when a run ends.
+Stage events and sampled progress go to the console and a JSON-lines log.
+"""
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import psutil
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server, write_to_textfile
+from pythonjsonlogger.json import JsonFormatter
+
+
+# ---------------------
+# CONSTANTS & CONFIG
+# ---------------------
+METRICS_DIR = Path("./outputs/metrics")
+LOG_DIR = Path("./outputs/logs")
+PROGRESS_INTERVAL = 5.0  # seconds between progress lines
+RSS_SAMPLE_INTERVAL = 0.05  # seconds between memory samples
+
+logger = logging.getLogger("moodboard")
+
+REGISTRY = CollectorRegistry()
+
+STAGE_SECONDS = Histogram(
+    "moodboard_stage_seconds", "Wall-clock time per pipeline stage", ["stage"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600, float("inf")), registry=REGISTRY,
+)
+STAGE_ITEMS = Counter("moodboard_stage_items", "Items processed per pipeline stage", ["stage"], registry=REGISTRY)
+STAGE_PEAK_RSS = Gauge("moodboard_stage_peak_rss_bytes", "Peak resident memory seen during a stage", ["stage"], registry=REGISTRY)
+SPAN_SECONDS = Histogram("moodboard_span_seconds", "Time spent in named operations inside a stage", ["span"], registry=REGISTRY)
+
+PAGES_FETCHED = Counter("moodboard_pages_fetched", "Tatoeba search pages loaded", ["language"], registry=REGISTRY)
+SENTENCES_SCRAPED = Counter("moodboard_sentences_scraped", "Sentences kept from scraped pages", ["language"], registry=REGISTRY)
+PARSES = Counter("moodboard_parses", "Sentences run through a spaCy pipeline", ["language"], registry=REGISTRY)
+UNMATCHED_SENTENCES = Counter(
+    "moodboard_unmatched_sentences", "Parsed sentences that yielded no keyword relations", ["language", "reason"], registry=REGISTRY,
+)
+TRANSLATION_LOOKUPS = Counter(
+    "moodboard_translation_lookups", "Co-word translation lookups by result (hit, miss, skipped, prefetch)", ["result"], registry=REGISTRY,
+)
+TRANSLATION_CALLS = Counter("moodboard_translation_calls", "Requests sent to DeepL", ["outcome"], registry=REGISTRY)
+QUEUE_DEPTH = Gauge("moodboard_queue_depth", "Items waiting between pipelined stages", ["queue"], registry=REGISTRY)
+DEDUP_COMPARISONS = Counter("moodboard_dedup_comparisons", "Pairwise similarity checks in deduplicate_embeddings", registry=REGISTRY)
+
+
+# Plain tallies behind the hit-rate gauge; a gauge callback must not read REGISTRY,
+# since collecting the registry would call the callback again.
+_lookup_tallies = {"hit": 0, "miss": 0}
+_lookup_lock = threading.Lock()
+
+
+def count_translation_lookup(result):
+    """Record one translation lookup (hit, miss, skipped, ...)."""
+    TRANSLATION_LOOKUPS.labels(result).inc()
+    if result in _lookup_tallies:
+        with _lookup_lock:
+            _lookup_tallies[result] += 1
+
+
+def cache_hit_rate():
+    """Share of non-English translation lookups served from the cache."""
+    with _lookup_lock:
+        hits, misses = _lookup_tallies["hit"], _lookup_tallies["miss"]
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+CACHE_HIT_RATE = Gauge("moodboard_translation_cache_hit_ratio", "Translation cache hit rate", registry=REGISTRY)
+CACHE_HIT_RATE.set_function(cache_hit_rate)
+PROCESS_RSS = Gauge("moodboard_process_rss_bytes", "Current resident memory of the process", registry=REGISTRY)
+PROCESS_RSS.set_function(lambda: psutil.Process().memory_info().rss)
+
+
+# ---------------------
+# TIMERS & SAMPLERS
+# ---------------------
+class PeakRSSSampler:
+    """Track the peak resident set size of this process on a background thread."""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baseline = self.peak = self.process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+class StageTimer:
+    """Handle yielded by `stage`; set `items` to record throughput."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.seconds = 0.0
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage, sample its peak memory and log start/finish events."""
+    timer = StageTimer(name)
+    rss = PeakRSSSampler()
+    logger.info(f"Starting {name}", extra={"event": "stage_start", "stage": name})
+    status = "error"
+    start = time.perf_counter()
+    try:
+        with rss:
+            yield timer
+        status = "ok"
+    finally:
+        timer.seconds = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(timer.seconds)
+        STAGE_ITEMS.labels(name).inc(timer.items)
+        STAGE_PEAK_RSS.labels(name).set(rss.peak)
+        logger.info(
+            f"Finished {name} in {timer.seconds:.1f}s ({timer.items} items)",
+            extra={
+                "event": "stage_end",
+                "stage": name,
+                "status": status,
+                "seconds": round(timer.seconds, 4),
+                "items": timer.items,
+                "items_per_s": round(timer.items / timer.seconds, 2) if timer.seconds else None,
+                "peak_rss_bytes": rss.peak,
+            },
+        )
+
+
+@contextmanager
+def span(name):
+    """Time one operation inside a stage, e.g. a page load or a model load."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+class Progress:
+    """Rate-limited progress reporting in place of per-item prints."""
+
+    def __init__(self, name, total=None, interval=PROGRESS_INTERVAL):
+        self.name = name
+        self.total = total
+        self.interval = interval
+        self.count = 0
+        self._start = self._last = time.monotonic()
+
+    def tick(self, n=1, **fields):
+        self.count += n
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._report(now, fields)
+
+    def done(self, **fields):
+        self._report(time.monotonic(), fields, event="progress_done")
+
+    def _report(self, now, fields, event="progress"):
+        elapsed = now - self._start
+        rate = self.count / elapsed if elapsed else 0.0
+        of_total = f"/{self.total}" if self.total is not None else ""
+        logger.info(
+            f"{self.name}: {self.count}{of_total} ({rate:.1f}/s)",
+            extra={"event": event, "stage": self.name, "count": self.count, "total": self.total,
+                   "items_per_s": round(rate, 2), **fields},
+        )
+
+
+# ---------------------
+# SETUP & EXPORT
+# ---------------------
+def add_arguments(parser, script_name):
+    """Add the shared --log-file/--metrics-file/--metrics-port options to a parser."""
+    parser.add_argument("--log-file", default=str(LOG_DIR / f"{script_name}.jsonl"), help="JSON-lines log path")
+    parser.add_argument("--metrics-file", default=str(METRICS_DIR / f"{script_name}.prom"), help="Prometheus text file written at the end of the run")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port while running")
+
+
+def configure_logging(log_file=None, level=logging.INFO):
+    """Send progress to stdout as plain text and, optionally, to a JSON-lines file."""
+    logger.handlers.clear()
+    logger.setLevel(level)
+    logger.propagate = False
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(console)
+
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        json_handler = logging.FileHandler(log_file, encoding="utf-8")
+        json_handler.setFormatter(JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(json_handler)
+
+
+def export_metrics(metrics_file):
+    """Write every metric in the registry to a Prometheus text file."""
+    Path(metrics_file).parent.mkdir(parents=True, exist_ok=True)
+    write_to_textfile(str(metrics_file), REGISTRY)
+
+
+@contextmanager
+def instrumented_run(script_name, log_file=None, metrics_file=None, metrics_port=None):
+    """Configure logging/metrics for a script and export everything when it ends."""
+    configure_logging(log_file)
+    if metrics_port:
+        start_http_server(metrics_port, registry=REGISTRY)
+        logger.info(f"Serving metrics on :{metrics_port}/metrics", extra={"event": "metrics_server", "port": metrics_port})
+    try:
+        with stage(script_name):
+            yield
+    finally:
+        if metrics_file:
+            export_metrics(metrics_file)
+        logger.info(
+            f"Metrics written to {metrics_file}" if metrics_file else "Run finished",
+            extra={"event": "run_end", "script": script_name, "translation_cache_hit_rate": round(cache_hit_rate(), 4)},
+        )
@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 from pathlib import Path
@@ -6,6 +7,9 @@ import deepl
 import pandas as pd
 from dotenv import load_dotenv
 
+import instrumentation
+from instrumentation import TRANSLATION_CALLS, Progress, count_translation_lookup, logger, span, stage
+
 
 # ---------------------
 # CONSTANTS & CONFIG
@@ -19,6 +23,8 @@ LANG_CODES = {
 }
 
 CACHE_PATH = Path("cache/translation_cache.json")
+VIZ_PATH = Path("./outputs/freedom_viz_ready.csv")
+DELTA_DIR = Path("./outputs/viz_deltas")  # watched by dash_app.py
 
 
 # ---------------------
@@ -41,68 +47,69 @@ def save_translation_cache(cache):
     print("✅ Saved cache.")
 
 
-def translate_coword_english(row, translator, translation_cache, counter):
-    """Translate co_word to English using DeepL API and caching."""
-    counter[0] += 1
+def translate_coword_english(row, translator, translation_cache, progress=None, prefetch=False):
+    """Translate co_word to English using DeepL API and caching.
+
+    Lookups made with prefetch=True (cache warm-up ahead of aggregation) are counted
+    as "prefetch" rather than hit/miss, so the hit rate only covers the aggregation pass.
+    """
+    if progress is not None:
+        progress.tick()
 
     co_word = row["co_word"]
     lang_name = row["lang_name"]
 
     if lang_name == "English":
-        print(f"{counter[0]}. Skipping English word: {co_word}")
+        count_translation_lookup("skipped")
         return co_word
     
     # Use cache key
     key = f"{lang_name}:{co_word.lower()}"
     if key in translation_cache:
-        print(f"{counter[0]}. Using cached translation for: {co_word} ({lang_name}) → {translation_cache[key]}")
+        count_translation_lookup("prefetch" if prefetch else "hit")
         return translation_cache[key]
+    count_translation_lookup("prefetch" if prefetch else "miss")
 
     try:
-        print(f"{counter[0]}. Translating {co_word} from {lang_name}...")
-        translated = translator.translate_text(
-            co_word,
-            source_lang=LANG_CODES[lang_name].upper(),
-            target_lang="EN-US"
-        )
+        with span("translate_call"):
+            translated = translator.translate_text(
+                co_word,
+                source_lang=LANG_CODES[lang_name].upper(),
+                target_lang="EN-US"
+            )
         translated_word = translated.text.strip().capitalize()
 
         if translated.detected_source_lang != LANG_CODES[lang_name].upper():
-            print(f"Incorrect language detection for: {co_word}. \n" 
-                  f"DeepL detected language {translated.detected_source_lang} \n"
-                  f"LANG_CODES detected {LANG_CODES[lang_name]}")
+            logger.warning(
+                f"Incorrect language detection for: {co_word}. "
+                f"DeepL detected language {translated.detected_source_lang}, "
+                f"LANG_CODES detected {LANG_CODES[lang_name]}",
+                extra={"event": "language_mismatch", "co_word": co_word, "lang_name": lang_name},
+            )
 
         # Catch poor translations (e.g., identical result)
         if not translated_word or translated_word.lower() == co_word.lower():
-            print(f"No useful translation for: {co_word}")
+            TRANSLATION_CALLS.labels("no_translation").inc()
             translation_cache[key] = None
             return None
 
-        print(f"Translated to '{translated_word}'")
+        TRANSLATION_CALLS.labels("ok").inc()
         translation_cache[key] = translated_word
         return translated_word
 
     except Exception as e:
-        print(f"Error translating '{co_word}': {str(e)}")
+        TRANSLATION_CALLS.labels("error").inc()
+        logger.warning(f"Error translating '{co_word}': {str(e)}",
+                       extra={"event": "translation_error", "co_word": co_word, "lang_name": lang_name})
         translation_cache[key] = None
         return None
 
 
-# ---------------------
-# MAIN EXECUTION
-# ---------------------
-def main():
-    # Setup
-    translation_cache = load_translation_cache()
-    load_dotenv()
-    api_key = os.getenv("DEEPL_API_KEY")
-    translator = deepl.Translator(api_key)
-    counter = [0]  # Use list for mutable counter
-    
-    # Data loading
-    df = pd.read_csv("./outputs/spacy_freedom_dependence_analysis.csv")
-    
+def prepare_viz_data(df, translator, translation_cache):
+    """Clean dependency results, translate co-words and add frequency columns."""
+
     # Clean up and formatting
+    df = df.copy()
     df["co_word"] = df["co_word"].str.strip().str.lower()
     df["pos"] = df["pos"].str.strip().str.upper()
     df = df.drop_duplicates(subset=["lang_name", "co_word", "sentence"])
@@ -119,10 +126,12 @@ def main():
     
     # Merge and translate
     df_merged = df.merge(df_freq, on=["lang_name", "co_word"], how="left")
+    progress = Progress("translate", total=len(df_merged))
     df_merged["english_coword"] = df_merged.apply(
-        lambda row: translate_coword_english(row, translator, translation_cache, counter), 
+        lambda row: translate_coword_english(row, translator, translation_cache, progress), 
         axis=1
     )
+    progress.done()
     df_merged["english_coword"] = df_merged["english_coword"].str.strip().str.lower()
     
     # Calculate shared word frequencies
@@ -141,14 +150,102 @@ def main():
     # Final formatting
     df_merged.columns = [col.strip().lower().replace(" ", "_") for col in df_merged.columns]
     df_merged["combined_label"] = df_merged["english_coword"] + " (" + df_merged["co_word"] + ")"
-    
-    # Save results
-    df_merged.to_csv("./outputs/freedom_viz_ready.csv", index=False)
+    return df_merged
+
+
+# ---------------------
+# MAIN EXECUTION
+# ---------------------
+def get_translator():
+    """Create a DeepL client from DEEPL_API_KEY (read from .env if present)."""
+    load_dotenv()
+    api_key = os.getenv("DEEPL_API_KEY")
+    return deepl.Translator(api_key)
+
+
+def aggregate_counts(df_merged):
+    """Map (english_coword, lang_name) to count, aggregated the same way dash_app.py does."""
+    df = df_merged[df_merged["english_coword"] != "freedom"]
+    agg = df.groupby(["english_coword", "lang_name"])["count"].first()
+    return {key: int(value) for key, value in agg.items()}
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def publish_viz_delta(df_merged):
+    """Publish the change in aggregated counts since the last run for dash_app.py to apply.
+
+    Writes delta_<seq>.json with (english_coword, lang_name, count change)
+    rows, then snapshot.json with the full aggregate at that seq. The
+    baseline is the previous snapshot or, on the first run, the viz CSV
+    still on disk, i.e. whatever a running dashboard has loaded.
+    """
+    DELTA_DIR.mkdir(parents=True, exist_ok=True)
+    snapshot_path = DELTA_DIR / "snapshot.json"
+    if snapshot_path.exists():
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        seq = snapshot["seq"]
+        old_counts = {(word, lang): count for word, lang, count in snapshot["counts"]}
+    else:
+        seq = 0
+        old_counts = aggregate_counts(pd.read_csv(VIZ_PATH)) if VIZ_PATH.exists() else {}
+
+    new_counts = aggregate_counts(df_merged)
+    changes = [
+        [word, lang, new_counts.get((word, lang), 0) - old_counts.get((word, lang), 0)]
+        for word, lang in sorted(old_counts.keys() | new_counts.keys())
+        if new_counts.get((word, lang), 0) != old_counts.get((word, lang), 0)
+    ]
+
+    if changes:
+        seq += 1
+        _write_json_atomic(DELTA_DIR / f"delta_{seq:06d}.json", {"seq": seq, "changes": changes})
+    counts = [[word, lang, count] for (word, lang), count in sorted(new_counts.items())]
+    _write_json_atomic(snapshot_path, {"seq": seq, "counts": counts})
+    print(f"Published {len(changes)} aggregate changes (seq {seq}).")
+
+
+def save_viz_data(df_merged, translation_cache):
+    """Write the visualization dataset as csv and xlsx and persist the translation cache."""
+    publish_viz_delta(df_merged)
+    df_merged.to_csv(VIZ_PATH, index=False)
     df_merged.to_excel("./outputs/freedom_viz_ready_worksheeet.xlsx", index=False, engine='openpyxl')
     save_translation_cache(translation_cache)
-    
     print("✅ Cleaned dataset saved as csv and xlsx.")
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Translate co-words and build the visualization dataset.")
+    instrumentation.add_arguments(parser, "prep_viz_data")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    with instrumentation.instrumented_run("prep_viz_data", args.log_file, args.metrics_file, args.metrics_port):
+        # Setup
+        translation_cache = load_translation_cache()
+        translator = get_translator()
+        
+        # Data loading
+        df = pd.read_csv("./outputs/spacy_freedom_dependence_analysis.csv")
+        
+        # Clean, translate and aggregate
+        with stage("translate_aggregate") as timer:
+            df_merged = prepare_viz_data(df, translator, translation_cache)
+            timer.items = len(df)
+        
+        # Save results
+        save_viz_data(df_merged, translation_cache)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
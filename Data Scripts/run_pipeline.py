@@ -0,0 +1,295 @@
+"""Run scrape -> dedup -> parse -> translate as overlapping stages.
+
+Each stage runs in its own thread and hands work to the next through a
+bounded queue, so parsing happens while the scraper waits on Tatoeba and
+DeepL calls happen while spaCy is busy. A full queue blocks its producer,
+which keeps memory flat when one stage falls behind. Embedding dedup and
+the final aggregation need every sentence, so they run once the queues
+have drained. Outputs are the same files the scripts write one by one.
+
+Trade-off: the translate stage prefetches co-words from every exactly
+deduplicated sentence, before embedding dedup has run. Co-words that only
+occur in near-duplicates it later drops are still sent to DeepL (billable)
+and kept in the translation cache, which the one-by-one scripts never do.
+Pass --no-prefetch to translate only during the final aggregation instead.
+"""
+import argparse
+import queue
+import threading
+
+import pandas as pd
+
+import instrumentation
+from analyze_with_spacy import (
+    MODEL_TIERS, PARSE_BATCH_SIZE, add_tier_arguments, analyze_batch, load_model, parse_tiers, save_results,
+)
+from instrumentation import QUEUE_DEPTH, logger, stage
+from prep_viz_data import get_translator, load_translation_cache, prepare_viz_data, save_viz_data, translate_coword_english
+from selenium_scraper import (
+    MAX_PAGES, OUTPUT_PATH, TARGETS, deduplicate_embeddings, iter_scraped_pages, normalize, setup_selenium,
+)
+
+
+# ---------------------
+# CONSTANTS & CONFIG
+# ---------------------
+QUEUE_SIZE = 32  # batches buffered between two stages before the producer blocks
+REPLAY_PAGE_SIZE = 10  # sentences per fake "page" when replaying a CSV
+LANGUAGE_ORDER = {lang_name: i for i, lang_name in enumerate(MODEL_TIERS)}
+
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    """Raised inside a worker when another stage has failed."""
+
+
+# ---------------------
+# QUEUE PLUMBING
+# ---------------------
+def _put(q, item, stop):
+    """Block until q has room, giving up if the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise _Cancelled
+
+
+def _consume(q, stop):
+    """Yield items from q until the upstream stage sends _DONE."""
+    while True:
+        try:
+            item = q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Cancelled
+            continue
+        if item is _DONE:
+            return
+        yield item
+
+
+def _bounded_queue(name, size=QUEUE_SIZE):
+    q = queue.Queue(maxsize=size)
+    QUEUE_DEPTH.labels(name).set_function(q.qsize)
+    return q
+
+
+class Worker(threading.Thread):
+    """Run one stage in a thread; a failure stops every other stage."""
+
+    def __init__(self, name, work, stop):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            with stage(self.name) as timer:
+                self.work(timer)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            self.error = e
+            self.stop.set()
+
+
+# ---------------------
+# STAGES
+# ---------------------
+def replay_pages(csv_path):
+    """Yield an existing scraped-sentences CSV in page-sized chunks instead of scraping."""
+    df = pd.read_csv(csv_path)
+    rows = df[["language", "source_word", "sentence"]].to_dict("records")
+    for start in range(0, len(rows), REPLAY_PAGE_SIZE):
+        yield rows[start:start + REPLAY_PAGE_SIZE]
+
+
+def scrape_stage(pages, out_q, stop):
+    """Push each scraped page downstream as soon as it arrives."""
+    def work(timer):
+        for page_sentences in pages:
+            _put(out_q, page_sentences, stop)
+            timer.items += len(page_sentences)
+        _put(out_q, _DONE, stop)
+    return work
+
+
+def dedup_stage(in_q, out_q, stop, sentences, batch_size):
+    """Normalize, drop exact duplicates and group new sentences into per-language parse batches.
+
+    Every sentence kept is also appended to `sentences` (in scrape order) for the final embedding dedup.
+    """
+    def work(timer):
+        seen = set()
+        buffers = {}
+        for page_sentences in _consume(in_q, stop):
+            for row in page_sentences:
+                sentence = normalize(row["sentence"])
+                if sentence in seen:
+                    continue
+                seen.add(sentence)
+                row = {**row, "sentence": sentence, "seq": len(sentences)}
+                sentences.append(row)
+                timer.items += 1
+
+                buffer = buffers.setdefault(row["language"], [])
+                buffer.append(row)
+                if len(buffer) >= batch_size:
+                    _put(out_q, buffers.pop(row["language"]), stop)
+        for buffer in buffers.values():
+            _put(out_q, buffer, stop)
+        _put(out_q, _DONE, stop)
+    return work
+
+
+def parse_stage(in_q, out_q, stop, tiers, relations, batch_size):
+    """Parse batches with nlp.pipe and send newly seen co-words on to translation (unless out_q is None)."""
+    def work(timer):
+        models = {}
+        seen_cowords = set()
+        for batch in _consume(in_q, stop):
+            lang_name = batch[0]["language"]
+            if lang_name not in models:
+                models[lang_name] = load_model(MODEL_TIERS[lang_name][tiers[lang_name]])
+            keyword = batch[0]["source_word"]
+
+            sentences = [row["sentence"] for row in batch]
+            batch_results = analyze_batch(sentences, lang_name, keyword, models[lang_name], batch_size=batch_size)
+            new_cowords = []
+            for row, sentence_results in zip(batch, batch_results):
+                for result in sentence_results:
+                    relations.append((LANGUAGE_ORDER[lang_name], row["seq"], result))
+                    co_word = result["co_word"].strip().lower()
+                    if lang_name != "English" and (lang_name, co_word) not in seen_cowords:
+                        seen_cowords.add((lang_name, co_word))
+                        new_cowords.append({"co_word": co_word, "lang_name": lang_name})
+            timer.items += len(batch)
+            if new_cowords and out_q is not None:
+                _put(out_q, new_cowords, stop)
+        if out_q is not None:
+            _put(out_q, _DONE, stop)
+    return work
+
+
+def translate_stage(in_q, stop, translator, translation_cache):
+    """Warm the translation cache so the final aggregation only sees cache hits.
+
+    Runs before embedding dedup, so it may translate co-words from sentences that are dropped later.
+    """
+    def work(timer):
+        for rows in _consume(in_q, stop):
+            for row in rows:
+                translate_coword_english(row, translator, translation_cache, prefetch=True)
+            timer.items += len(rows)
+    return work
+
+
+def run_pipeline(pages, tiers, translator, translation_cache, batch_size=PARSE_BATCH_SIZE, queue_size=QUEUE_SIZE,
+                 prefetch=True):
+    """Stream pages through the overlapped stages, then dedup and aggregate.
+
+    With prefetch=False no translate stage runs and co-words are translated during aggregation,
+    after embedding dedup, so DeepL only sees co-words the sequential scripts would translate.
+
+    Returns (deduped sentences DataFrame, dependency relations DataFrame, viz DataFrame).
+    """
+    stop = threading.Event()
+    pages_q = _bounded_queue("pages", queue_size)
+    parse_q = _bounded_queue("parse", queue_size)
+    translate_q = _bounded_queue("translate", queue_size) if prefetch else None
+    sentences, relations = [], []
+
+    workers = [
+        Worker("pipeline_scrape", scrape_stage(pages, pages_q, stop), stop),
+        Worker("pipeline_exact_dedup", dedup_stage(pages_q, parse_q, stop, sentences, batch_size), stop),
+        Worker("pipeline_parse", parse_stage(parse_q, translate_q, stop, tiers, relations, batch_size), stop),
+    ]
+    if prefetch:
+        workers.append(Worker("pipeline_translate", translate_stage(translate_q, stop, translator, translation_cache), stop))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    errors = [worker.error for worker in workers if worker.error is not None]
+    if errors:
+        raise errors[0]
+
+    # Near-duplicate removal needs the whole corpus, so it runs after streaming
+    df = pd.DataFrame(sentences, columns=["language", "source_word", "sentence", "seq"])
+    with stage("embedding_dedup") as timer:
+        unique_sentences = set(deduplicate_embeddings(df["sentence"].tolist())) if len(df) else set()
+        timer.items = len(df)
+    deduped_df = df[df["sentence"].isin(unique_sentences)].drop(columns="seq")
+    print(f"Sentences: {len(df)} after exact dedup, {len(deduped_df)} after embedding dedup")
+
+    # Relations were parsed in batch order; restore the language/sentence order of the one-by-one scripts
+    relations.sort(key=lambda item: (item[0], item[1]))
+    results = [result for _, _, result in relations if result["sentence"] in unique_sentences]
+    dep_df = pd.DataFrame(results)
+
+    with stage("translate_aggregate") as timer:
+        viz_df = prepare_viz_data(dep_df, translator, translation_cache)
+        timer.items = len(dep_df)
+
+    return deduped_df, results, viz_df
+
+
+# ---------------------
+# MAIN EXECUTION
+# ---------------------
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run scraping, parsing and translation as a pipelined job.")
+    parser.add_argument("--test", action="store_true", help="Only scrape a few English pages")
+    parser.add_argument("--input", default=None, help="Replay a scraped-sentences CSV instead of scraping Tatoeba")
+    parser.add_argument("--batch-size", type=int, default=PARSE_BATCH_SIZE, help="Sentences per nlp.pipe batch")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Batches buffered between stages")
+    parser.add_argument("--no-prefetch", dest="prefetch", action="store_false",
+                        help="Translate only after embedding dedup (no DeepL calls for co-words of dropped near-duplicates)")
+    add_tier_arguments(parser)
+    instrumentation.add_arguments(parser, "run_pipeline")
+    args = parser.parse_args()
+    return parser, args
+
+
+def main():
+    parser, args = parse_arguments()
+    tiers = parse_tiers(parser, args)
+
+    targets = TARGETS.copy()
+    max_pages = MAX_PAGES
+    if args.test:
+        print("Running in TEST mode: Only scraping English pages")
+        targets = [targets[0]]
+        max_pages = 5
+
+    with instrumentation.instrumented_run("run_pipeline", args.log_file, args.metrics_file, args.metrics_port):
+        translation_cache = load_translation_cache()
+        translator = get_translator()
+        driver = None if args.input else setup_selenium()
+
+        try:
+            pages = replay_pages(args.input) if args.input else iter_scraped_pages(driver, targets, max_pages)
+            deduped_df, results, viz_df = run_pipeline(
+                pages, tiers, translator, translation_cache, batch_size=args.batch_size, queue_size=args.queue_size,
+                prefetch=args.prefetch,
+            )
+        finally:
+            if driver is not None:
+                driver.quit()
+
+        if not args.input:
+            deduped_df.to_csv(OUTPUT_PATH, index=False, encoding="utf-8")
+            print(f"Saved {len(deduped_df)} sentences to {OUTPUT_PATH}")
+        save_results(results)
+        save_viz_data(viz_df, translation_cache)
+        logger.info("Pipeline finished", extra={"event": "pipeline_done", "sentences": len(deduped_df), "relations": len(results)})
+
+
+if __name__ == "__main__":
+    main()
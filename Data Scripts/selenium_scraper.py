@@ -10,6 +10,9 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from sentence_transformers import SentenceTransformer, util
 
+import instrumentation
+from instrumentation import DEDUP_COMPARISONS, PAGES_FETCHED, SENTENCES_SCRAPED, Progress, logger, span, stage
+
 
 # ------------------------
 # CONSTANTS & CONFIG
@@ -25,6 +28,7 @@ MAX_PAGES = 60
 DELAY = 2  # seconds between page loads
 BASE_URL = "https://tatoeba.org/en/sentences/search"
 OUTPUT_PATH = "./outputs/scraped_freedom_sentences.csv"
+DEDUP_MODEL = "distiluse-base-multilingual-cased-v2"
 
 
 # ------------------------
@@ -47,23 +51,38 @@ def normalize(text: str) -> str:
     return text
 
 
-def deduplicate_embeddings(sentences: list, threshold=0.95) -> list[str]:
-    """Take sentences and remove near-duplicate sentences."""
-    model = SentenceTransformer('distiluse-base-multilingual-cased-v2', device='cuda')
+def drop_exact_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize the sentence column and drop exact duplicate sentences."""
+    df = df.copy()
+    df["sentence"] = df["sentence"].apply(normalize)
+    return df.drop_duplicates(subset="sentence")
+
+
+def deduplicate_embeddings(sentences: list, threshold=0.95, model=None) -> list[str]:
+    """Take sentences and remove near-duplicate sentences.
+
+    `model` can be any object with a SentenceTransformer-style `encode`;
+    by default the multilingual DEDUP_MODEL is loaded on the GPU.
+    """
+    if model is None:
+        model = SentenceTransformer(DEDUP_MODEL, device='cuda')
     embeddings = model.encode(sentences, convert_to_tensor=True)
     cosine_scores = util.pytorch_cos_sim(embeddings, embeddings)
     
     keep = []
     dropped = set()
     n = len(sentences)
+    comparisons = 0
 
     for i in range(n):
         if i in dropped:
             continue
         keep.append(i)
+        comparisons += n - i - 1
         for j in range(i + 1, n):
             if cosine_scores[i][j] >= threshold:
                 dropped.add(j)
+    DEDUP_COMPARISONS.inc(comparisons)
 
     # print("\nDuplicates:")
     # for i in dropped:
@@ -72,19 +91,19 @@ def deduplicate_embeddings(sentences: list, threshold=0.95) -> list[str]:
     return [sentences[i] for i in keep]
 
 
-def scrape_sentences(driver, targets, max_pages):
-    """Scrape sentences from Tatoeba for all target languages."""
-    all_sentences = []
-    
-    # Run the scraper for each language
+def iter_scraped_pages(driver, targets, max_pages):
+    """Yield the sentences found on each Tatoeba search page as soon as it is loaded."""
     for target in targets:
         print(f"\nScraping {target['language']}...")
+        progress = Progress(f"scrape {target['language']}", total=max_pages)
 
         for page in range(1, max_pages + 1):
             query = f"{BASE_URL}?from={target['lang_code']}&query={target['word']}&page={page}&word_count_min=4"
-            print(f"Searching at {query}")
-            driver.get(query)
+            with span("page_load"):
+                driver.get(query)
+            PAGES_FETCHED.labels(target["language"]).inc()
             time.sleep(DELAY)
+            page_sentences = []
 
             try:
                 sentence_divs = driver.find_elements(By.CSS_SELECTOR, "div.text")
@@ -94,18 +113,30 @@ def scrape_sentences(driver, targets, max_pages):
                     lang = div.get_attribute("lang")
                     if lang == target["html_lang"]:
                         sentence = div.text.strip()
-                        print(f"→ {sentence}")
                         if sentence:
-                            all_sentences.append({
+                            page_sentences.append({
                                 "language": target["language"],
                                 "source_word": target["word"],
                                 "sentence": sentence
                             })
 
-                print(f"Page {page}: Found {len(sentence_divs)} sentence elements. \n")
+                SENTENCES_SCRAPED.labels(target["language"]).inc(len(page_sentences))
+                progress.tick(page=page, elements=len(sentence_divs), sentences=len(page_sentences))
             except Exception as e:
-                print(f"Error on page {page}: {e}")
-                continue
+                logger.warning(f"Error on page {page}: {e}", extra={"event": "page_error", "page": page, "query": query})
+
+            yield page_sentences
+
+        progress.done()
+
+
+def scrape_sentences(driver, targets, max_pages):
+    """Scrape sentences from Tatoeba for all target languages."""
+    all_sentences = []
+    
+    # Run the scraper for each language
+    for page_sentences in iter_scraped_pages(driver, targets, max_pages):
+        all_sentences.extend(page_sentences)
     
     return all_sentences
 
@@ -114,20 +145,19 @@ def process_and_save_data(all_sentences):
     """Process scraped sentences and save to CSV."""
     df = pd.DataFrame(all_sentences)
 
-    # Normalize the DF sentences
-    df["sentence"] = df["sentence"].apply(normalize)
-
-    # Remove exact duplicates
+    # Normalize the DF sentences and remove exact duplicates
     print(f"\nLength before dropping duplicates: {df.shape[0]}")
-    print(f"Exact duplicates to be dropped: {df[df.duplicated(subset='sentence', keep='first')]}")
-    df = df.drop_duplicates(subset="sentence")
+    with stage("exact_dedup") as timer:
+        df = drop_exact_duplicates(df)
+        timer.items = len(df)
     print(f"Length after dropping duplicates: {df.shape[0]}\n")
 
     # Remove highly similar sentences with sentence transformer
     sentences = df["sentence"].tolist()
-    print(f"Sentences: {sentences} \n")
     print(f"Length before removing duplicates: {len(sentences)}")
-    unique_sentences = deduplicate_embeddings(sentences)
+    with stage("embedding_dedup") as timer:
+        unique_sentences = deduplicate_embeddings(sentences)
+        timer.items = len(sentences)
     print(f"Length after removing duplicates: {len(unique_sentences)} \n")
 
     deduped_df = df[df["sentence"].isin(unique_sentences)].copy()  # EXACT MATCH, so case sensitivity
@@ -140,6 +170,7 @@ def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Scrape Tatoeba sentences.")
     parser.add_argument('--test', action='store_true', help='Run in test mode with limited scraping')
+    instrumentation.add_arguments(parser, "selenium_scraper")
     return parser.parse_args()
 
 
@@ -158,18 +189,21 @@ def main():
         targets = [targets[0]]
         max_pages = 5
     
-    # Set up Selenium
-    driver = setup_selenium()
-    
-    try:
-        # Scrape sentences
-        all_sentences = scrape_sentences(driver, targets, max_pages)
-        
-        # Process and save data
-        process_and_save_data(all_sentences)
-    finally:
-        # Always close the driver
-        driver.quit()
+    with instrumentation.instrumented_run("selenium_scraper", args.log_file, args.metrics_file, args.metrics_port):
+        # Set up Selenium
+        driver = setup_selenium()
+
+        try:
+            # Scrape sentences
+            with stage("scrape") as timer:
+                all_sentences = scrape_sentences(driver, targets, max_pages)
+                timer.items = len(all_sentences)
+
+            # Process and save data
+            process_and_save_data(all_sentences)
+        finally:
+            # Always close the driver
+            driver.quit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,320 @@
+"""Benchmark every pipeline stage on a synthetic corpus.
+
+Runs offline and on CPU: embeddings, dependency parses and DeepL are
+replaced by the stand-ins in stubs.py. Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "Data Scripts"))
+
+from analyze_with_spacy import MODEL_TIERS, PARSE_BATCH_SIZE, TIERS, analyze_batch, load_model  # noqa: E402
+from instrumentation import PeakRSSSampler, cache_hit_rate, export_metrics  # noqa: E402
+from prep_viz_data import aggregate_counts, prepare_viz_data, translate_coword_english  # noqa: E402
+from selenium_scraper import deduplicate_embeddings, drop_exact_duplicates  # noqa: E402
+from stubs import FakeTranslator, HashingEncoder, StubParser  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+
+
+# ------------------------
+# CONSTANTS & CONFIG
+# ------------------------
+DEFAULT_SIZES = [40, 1_000, 10_000]
+OUTPUT_DIR = Path("./outputs/benchmarks")
+RSS_SAMPLE_INTERVAL = 0.005  # seconds
+DASH_TABS = ["tab-1", "tab-2", "tab-3"]
+
+
+# ------------------------
+# MEASUREMENT
+# ------------------------
+def measure(stage, size, func, items_per_run):
+    """Run a stage function and summarise its timing and memory use.
+
+    `func` returns (latencies, output) where latencies are the seconds taken
+    by each operation: one per item for streaming stages, one per repeat for
+    batch stages. Throughput is items processed per wall-clock second.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        with PeakRSSSampler(RSS_SAMPLE_INTERVAL) as rss:
+            start = time.perf_counter()
+            latencies, output = func()
+            wall = time.perf_counter() - start
+
+    items = len(latencies) if items_per_run is None else items_per_run * len(latencies)
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95]) if latencies else (0.0, 0.0)
+    record = {
+        "stage": stage,
+        "size": size,
+        "items": items,
+        "seconds": round(wall, 6),
+        "throughput_per_s": round(items / wall, 3) if wall else None,
+        "latency_ms": {"p50": round(float(p50), 4), "p95": round(float(p95), 4)},
+        "peak_rss_mb": round(rss.peak / 2**20, 2),
+        "rss_delta_mb": round((rss.peak - rss.baseline) / 2**20, 2),
+    }
+    return record, output
+
+
+def repeat(func, repeats):
+    """Call a batch stage `repeats` times, returning per-call latencies and the last output."""
+    latencies, output = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = func()
+        latencies.append(time.perf_counter() - start)
+    return latencies, output
+
+
+# ------------------------
+# STAGES
+# ------------------------
+def bench_parse(corpus, parsers, batch_size=PARSE_BATCH_SIZE):
+    """Run the language analyzers through analyze_batch, as the pipeline does.
+
+    Latency is per sentence, amortised over the nlp.pipe batch it was parsed in.
+    """
+    latencies, results = [], []
+    for lang_name, group in corpus.groupby("language"):
+        keyword = group["source_word"].iloc[0]
+        nlp = parsers[lang_name]
+        sentences = group["sentence"].tolist()
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i:i + batch_size]
+            start = time.perf_counter()
+            batch_results = analyze_batch(batch, lang_name, keyword, nlp, batch_size=batch_size)
+            latencies.extend([(time.perf_counter() - start) / len(batch)] * len(batch))
+            for sentence_results in batch_results:
+                results.extend(sentence_results)
+    return latencies, pd.DataFrame(results)
+
+
+def bench_translate(dep_df, translator):
+    """Translate every dependency row through the translation cache, starting cold."""
+    cache, latencies = {}, []
+    for row in dep_df[["co_word", "lang_name"]].to_dict("records"):
+        start = time.perf_counter()
+        translate_coword_english(row, translator, cache)
+        latencies.append(time.perf_counter() - start)
+    return latencies, cache
+
+
+@contextlib.contextmanager
+def dash_workdir(viz_df):
+    """Temporary working directory laid out the way dash_app.py expects."""
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "outputs").mkdir()
+        viz_df.to_csv(Path(tmp) / "outputs" / "freedom_viz_ready.csv", index=False)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(cwd)
+
+
+def start_dash_app():
+    """Import dash_app.py and render every tab once, returning its functions."""
+    app_globals = runpy.run_path(str(ROOT / "dash_app.py"), run_name="dash_app")
+    for tab in DASH_TABS:
+        app_globals["render_content"](tab)
+    return app_globals
+
+
+def bench_dash_startup(viz_df, repeats):
+    """Time dash_app.py start-up (load, aggregate) plus a first render of every tab."""
+    with dash_workdir(viz_df):
+        return repeat(start_dash_app, repeats)
+
+
+def bench_dash_delta(viz_df, repeats, n_changes, seed):
+    """Time applying a published delta to a running dash_app and re-rendering every tab."""
+    rng = random.Random(seed)
+    keys = sorted(aggregate_counts(viz_df))
+    with dash_workdir(viz_df) as workdir:
+        app_globals = start_dash_app()
+        delta_dir = workdir / "outputs" / "viz_deltas"
+        delta_dir.mkdir()
+        latencies = []
+        for seq in range(1, repeats + 1):
+            changes = [[word, lang, 1] for word, lang in rng.sample(keys, min(n_changes, len(keys)))]
+            with open(delta_dir / f"delta_{seq:06d}.json", "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "changes": changes}, f)
+            start = time.perf_counter()
+            app_globals["apply_pending_deltas"]()
+            for tab in DASH_TABS:
+                app_globals["render_content"](tab)
+            latencies.append(time.perf_counter() - start)
+    return latencies, None
+
+
+def run_size(size, args):
+    """Run every stage for one corpus size and return its records."""
+    records = []
+    corpus = generate_corpus(size, seed=args.seed)
+    encoder = HashingEncoder()
+    if args.spacy_tier:
+        parsers = {lang_name: load_model(MODEL_TIERS[lang_name][args.spacy_tier]) for lang_name in MODEL_TIERS}
+    else:
+        parsers = {lang_name: StubParser(lang_name) for lang_name in MODEL_TIERS}
+    translator = FakeTranslator(latency=args.translate_latency)
+
+    record, deduped = measure("normalize_exact_dedup", size, lambda: repeat(lambda: drop_exact_duplicates(corpus), args.repeats), len(corpus))
+    records.append(record)
+
+    sentences = deduped["sentence"].tolist()[:args.dedup_max]
+    record, unique_sentences = measure(
+        "deduplicate_embeddings", size,
+        lambda: repeat(lambda: deduplicate_embeddings(sentences, model=encoder), args.repeats),
+        len(sentences),
+    )
+    records.append(record)
+
+    parse_input = deduped if args.parse_max is None else deduped.head(args.parse_max)
+    record, dep_df = measure("parse", size, lambda: bench_parse(parse_input, parsers, args.parse_batch_size), None)
+    records.append(record)
+
+    record, cache = measure("translate", size, lambda: bench_translate(dep_df, translator), None)
+    records.append(record)
+
+    record, viz_df = measure(
+        "prep_viz_data", size,
+        lambda: repeat(lambda: prepare_viz_data(dep_df, translator, dict(cache)), args.repeats),
+        len(dep_df),
+    )
+    records.append(record)
+
+    record, _ = measure("dash_startup", size, lambda: bench_dash_startup(viz_df, args.repeats), len(viz_df))
+    records.append(record)
+
+    record, _ = measure(
+        "dash_apply_delta", size,
+        lambda: bench_dash_delta(viz_df, args.repeats, args.delta_changes, args.seed),
+        args.delta_changes,
+    )
+    records.append(record)
+
+    print(f"size={size}: {len(deduped)} after exact dedup, {len(unique_sentences)} after embedding dedup, "
+          f"{len(dep_df)} relations, {translator.calls} translation calls")
+    return records
+
+
+# ------------------------
+# REPORTING
+# ------------------------
+def git_revision():
+    """Return the current commit hash, marked '-dirty' when the tree has changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def print_table(records):
+    print(f"\n{'stage':<24}{'size':>9}{'items':>10}{'items/s':>13}{'p50 ms':>11}{'p95 ms':>11}{'peak MB':>10}")
+    for r in records:
+        print(f"{r['stage']:<24}{r['size']:>9}{r['items']:>10}{r['throughput_per_s'] or 0:>13.1f}"
+              f"{r['latency_ms']['p50']:>11.3f}{r['latency_ms']['p95']:>11.3f}{r['peak_rss_mb']:>10.1f}")
+
+
+def compare(old_path, new_path):
+    """Print throughput, p95 latency and peak memory changes between two result files."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    old_records = {(r["stage"], r["size"]): r for r in old["results"]}
+
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"\n{'stage':<24}{'size':>9}{'throughput':>13}{'p95 latency':>14}{'peak MB':>10}")
+    for r in new["results"]:
+        base = old_records.get((r["stage"], r["size"]))
+        if base is None:
+            continue
+        speedup = (r["throughput_per_s"] or 0) / base["throughput_per_s"] if base["throughput_per_s"] else float("nan")
+        p95 = r["latency_ms"]["p95"] / base["latency_ms"]["p95"] if base["latency_ms"]["p95"] else float("nan")
+        rss = r["peak_rss_mb"] - base["peak_rss_mb"]
+        print(f"{r['stage']:<24}{r['size']:>9}{speedup:>12.2f}x{p95:>13.2f}x{rss:>+10.1f}")
+
+
+# ------------------------
+# MAIN EXECUTION
+# ------------------------
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (sentences) to run")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats for whole-batch stages")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic corpus")
+    parser.add_argument("--dedup-max", type=int, default=5_000,
+                        help="Cap on sentences sent to deduplicate_embeddings (it builds an n x n similarity matrix)")
+    parser.add_argument("--parse-max", type=int, default=None, help="Cap on sentences sent to the analyzers")
+    parser.add_argument("--parse-batch-size", type=int, default=PARSE_BATCH_SIZE, help="Sentences per nlp.pipe batch in the parse stage")
+    parser.add_argument("--spacy-tier", choices=TIERS, default=None,
+                        help="Parse with installed spaCy models of this tier instead of the offline stub parser")
+    parser.add_argument("--delta-changes", type=int, default=5, help="(co-word, language) counts changed per dashboard delta")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="Simulated seconds per DeepL call")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: outputs/benchmarks/<time>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = git_revision()
+    started = datetime.now(timezone.utc)
+    records = []
+    for size in args.sizes:
+        records.extend(run_size(size, args))
+
+    result = {
+        "meta": {
+            "commit": commit,
+            "timestamp": started.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        "results": records,
+    }
+
+    output = Path(args.output) if args.output else OUTPUT_DIR / f"{started:%Y%m%dT%H%M%S}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    # Also a smoke check that the shared registry can be collected and exported
+    metrics_file = output.with_suffix(".prom")
+    export_metrics(metrics_file)
+
+    print_table(records)
+    print(f"\nSaved benchmark results to {output}")
+    print(f"Saved metrics to {metrics_file} (translation cache hit rate {cache_hit_rate():.2f})")
+
+
+if __name__ == "__main__":
+    main()
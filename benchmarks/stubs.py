@@ -0,0 +1,186 @@
+"""Offline stand-ins for the models and services the pipeline normally needs.
+
+None of these try to be accurate. They produce output with the same shape
+as the real thing (embeddings, parsed Docs, DeepL results) so every stage
+can be exercised on a laptop without a GPU, model downloads or an API key.
+"""
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+import spacy
+import torch
+from spacy.tokens import Doc
+
+from synthetic_corpus import CATEGORY_POS, LEXICONS
+
+
+# ------------------------
+# CONSTANTS & CONFIG
+# ------------------------
+SPACY_LANG_CODES = {"English": "en", "German": "de", "Spanish": "es", "Italian": "it"}
+
+# Dependency labels the analyzers look for, per language family
+SUBJECT_DEP = {"German": "sb"}
+OBJECT_DEP = {"German": "oa"}
+
+TextResult = namedtuple("TextResult", ["text", "detected_source_lang"])
+
+
+# ------------------------
+# EMBEDDINGS
+# ------------------------
+class HashingEncoder:
+    """Character-trigram hashing encoder with a SentenceTransformer-style `encode`."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def encode(self, sentences, convert_to_tensor=False):
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            text = f"  {sentence.lower()} "
+            for i in range(len(text) - 2):
+                vectors[row, zlib.crc32(text[i:i + 3].encode("utf-8")) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-12)
+        return torch.from_numpy(vectors) if convert_to_tensor else vectors
+
+
+# ------------------------
+# DEPENDENCY PARSING
+# ------------------------
+def _pos_lexicon(lang_name):
+    """Map lowercased synthetic-corpus words to their part of speech."""
+    lex = LEXICONS[lang_name]
+    pos_lookup = {lex["article"].lower(): "DET"}
+    for category, pos in CATEGORY_POS.items():
+        entries = lex[category] if isinstance(lex[category], list) else [lex[category]]
+        for entry in entries:
+            words = entry.lower().split()
+            for word in words[:-1]:
+                pos_lookup.setdefault(word, "DET")
+            pos_lookup.setdefault(words[-1], pos)
+    return pos_lookup
+
+
+class StubParser:
+    """Rule-based tagger/parser returning spaCy Docs for a single language.
+
+    Uses a blank spaCy tokenizer, tags words from the synthetic corpus
+    lexicon and attaches them around the first verb, with the keyword as
+    subject or object. Only meant to keep the analyzers busy offline.
+    """
+
+    def __init__(self, lang_name):
+        self.lang_name = lang_name
+        self.tokenizer = spacy.blank(SPACY_LANG_CODES[lang_name]).tokenizer
+        self.vocab = self.tokenizer.vocab
+        self.keyword = LEXICONS[lang_name]["keyword"].lower()
+        self.pos_lookup = _pos_lexicon(lang_name)
+
+    def _tag(self, word):
+        lower = word.lower()
+        if lower == self.keyword:
+            return "NOUN"
+        if lower in self.pos_lookup:
+            return self.pos_lookup[lower]
+        if word.isdigit():
+            return "NUM"
+        if not any(ch.isalnum() for ch in word):
+            return "PUNCT"
+        return "PROPN" if word[:1].isupper() else "NOUN"
+
+    @staticmethod
+    def _noun_after(pos, i):
+        """Index of the noun closing the DET/ADJ run starting at i, if any."""
+        for j in range(i + 1, len(pos)):
+            if pos[j] in ("NOUN", "PROPN"):
+                return j
+            if pos[j] not in ("DET", "ADJ"):
+                return None
+        return None
+
+    def __call__(self, sentence):
+        tokens = self.tokenizer(sentence)
+        words = [t.text for t in tokens]
+        spaces = [bool(t.whitespace_) for t in tokens]
+        pos = [self._tag(w) for w in words]
+        n = len(words)
+
+        root = next((i for i, p in enumerate(pos) if p in ("VERB", "AUX")), 0)
+        heads = [root] * n
+        deps = ["dep"] * n
+        deps[root] = "ROOT"
+
+        for i, (word, tag) in enumerate(zip(words, pos)):
+            if i == root:
+                continue
+            if word.lower() == self.keyword:
+                if i < root:
+                    deps[i] = SUBJECT_DEP.get(self.lang_name, "nsubj")
+                else:
+                    deps[i] = OBJECT_DEP.get(self.lang_name, "obj")
+            elif tag in ("DET", "ADJ") and self._noun_after(pos, i) is not None:
+                heads[i] = self._noun_after(pos, i)
+                deps[i] = "det" if tag == "DET" else "amod"
+            elif tag == "ADJ" and i > 0 and pos[i - 1] == "NOUN" and i - 1 != root:
+                heads[i] = i - 1
+                deps[i] = "amod"
+            elif tag == "ADJ":
+                deps[i] = "acomp"
+            elif tag == "NOUN" and i < root:
+                deps[i] = "nsubj"
+            elif tag == "ADP" and i + 1 < n:
+                heads[i] = i + 1
+                deps[i] = "case"
+            elif tag in ("PROPN", "NUM"):
+                deps[i] = "obl"
+            elif tag == "PUNCT":
+                deps[i] = "punct"
+
+        lemmas = [w.lower() for w in words]
+        return Doc(self.vocab, words=words, spaces=spaces, pos=pos, heads=heads, deps=deps, lemmas=lemmas)
+
+    def pipe(self, texts, batch_size=None):
+        for text in texts:
+            yield self(text)
+
+
+# ------------------------
+# TRANSLATION
+# ------------------------
+def _english_lookup():
+    """Map 'Language:word' to the parallel English lexicon entry."""
+    english = LEXICONS["English"]
+    lookup = {}
+    for lang_name, lex in LEXICONS.items():
+        if lang_name == "English":
+            continue
+        for category in CATEGORY_POS:
+            if not isinstance(lex[category], list):
+                continue
+            for source, target in zip(lex[category], english[category]):
+                lookup[f"{lang_name}:{source.lower().split()[-1]}"] = target.split()[-1]
+        lookup[f"{lang_name}:{lex['keyword'].lower()}"] = english["keyword"]
+        lookup[f"{lang_name}:{lex['copula']}"] = english["copula"]
+    return lookup
+
+
+class FakeTranslator:
+    """Drop-in for deepl.Translator.translate_text with optional network latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.lookup = _english_lookup()
+        self.lang_names = {code.upper(): name for name, code in SPACY_LANG_CODES.items()}
+
+    def translate_text(self, text, source_lang, target_lang):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        lang_name = self.lang_names.get(source_lang, "")
+        translated = self.lookup.get(f"{lang_name}:{text.lower()}", text)
+        return TextResult(text=translated, detected_source_lang=source_lang)
@@ -0,0 +1,174 @@
+import argparse
+import random
+from pathlib import Path
+
+import pandas as pd
+
+
+# ------------------------
+# CONSTANTS & CONFIG
+# ------------------------
+SEED_PATH = Path(__file__).resolve().parent.parent / "tests" / "test_scraped_sentences.csv"
+
+# Word lists are parallel across languages: index i of a category means the
+# same thing in every language, which lets the fake translator map them back
+# to English.
+LEXICONS = {
+    "English": {
+        "keyword": "freedom",
+        "subjects": ["Citizens", "Workers", "Students", "Writers", "Farmers", "Soldiers", "Artists", "Our neighbours"],
+        "verbs": ["defend", "value", "love", "want", "demand", "protect", "lose", "need", "celebrate", "deny", "limit"],
+        "dets": ["the", "our", "their", "more", "no"],
+        "adjs": ["real", "personal", "religious", "political", "economic", "true", "absolute", "individual", "academic", "total"],
+        "article": "The",
+        "copula": "is",
+        "preds": ["important", "fragile", "precious", "necessary", "possible", "dangerous", "expensive", "rare"],
+        "place_preps": ["in", "across", "beyond", "throughout"],
+        "time_preps": ["since", "after", "before", "until"],
+        "adj_after_noun": False,
+    },
+    "German": {
+        "keyword": "Freiheit",
+        "subjects": ["Die Bürger", "Die Arbeiter", "Die Studenten", "Die Schriftsteller", "Die Bauern", "Die Soldaten", "Die Künstler", "Unsere Nachbarn"],
+        "verbs": ["verteidigen", "schätzen", "lieben", "wollen", "fordern", "schützen", "verlieren", "brauchen", "feiern", "verweigern", "begrenzen"],
+        "dets": ["die", "unsere", "ihre", "mehr", "keine"],
+        "adjs": ["echte", "persönliche", "religiöse", "politische", "wirtschaftliche", "wahre", "absolute", "individuelle", "akademische", "totale"],
+        "article": "Die",
+        "copula": "ist",
+        "preds": ["wichtig", "zerbrechlich", "kostbar", "notwendig", "möglich", "gefährlich", "teuer", "selten"],
+        "place_preps": ["in", "über", "jenseits", "durch"],
+        "time_preps": ["seit", "nach", "vor", "bis"],
+        "adj_after_noun": False,
+    },
+    "Spanish": {
+        "keyword": "libertad",
+        "subjects": ["Los ciudadanos", "Los trabajadores", "Los estudiantes", "Los escritores", "Los campesinos", "Los soldados", "Los artistas", "Nuestros vecinos"],
+        "verbs": ["defienden", "valoran", "aman", "quieren", "exigen", "protegen", "pierden", "necesitan", "celebran", "niegan", "limitan"],
+        "dets": ["la", "nuestra", "su", "más", "ninguna"],
+        "adjs": ["real", "personal", "religiosa", "política", "económica", "verdadera", "absoluta", "individual", "académica", "total"],
+        "article": "La",
+        "copula": "es",
+        "preds": ["importante", "frágil", "preciosa", "necesaria", "posible", "peligrosa", "cara", "rara"],
+        "place_preps": ["en", "por", "hacia", "sobre"],
+        "time_preps": ["desde", "tras", "antes", "hasta"],
+        "adj_after_noun": True,
+    },
+    "Italian": {
+        "keyword": "libertà",
+        "subjects": ["I cittadini", "I lavoratori", "Gli studenti", "Gli scrittori", "I contadini", "I soldati", "Gli artisti", "I nostri vicini"],
+        "verbs": ["difendono", "apprezzano", "amano", "vogliono", "chiedono", "proteggono", "perdono", "cercano", "celebrano", "negano", "limitano"],
+        "dets": ["la", "nostra", "loro", "più", "nessuna"],
+        "adjs": ["reale", "personale", "religiosa", "politica", "economica", "vera", "assoluta", "individuale", "accademica", "totale"],
+        "article": "La",
+        "copula": "è",
+        "preds": ["importante", "fragile", "preziosa", "necessaria", "possibile", "pericolosa", "cara", "rara"],
+        "place_preps": ["a", "in", "per", "verso"],
+        "time_preps": ["dal", "dopo", "prima", "fino"],
+        "adj_after_noun": True,
+    },
+}
+
+PLACES = ["Paris", "Berlin", "Madrid", "Rome", "Boston", "Vienna", "Lisbon", "Naples", "Munich", "Seville"]
+YEARS = range(1800, 2026)
+
+# POS for each lexicon category, shared with the stub parser
+CATEGORY_POS = {
+    "subjects": "NOUN",
+    "verbs": "VERB",
+    "dets": "DET",
+    "adjs": "ADJ",
+    "copula": "AUX",
+    "preds": "ADJ",
+    "place_preps": "ADP",
+    "time_preps": "ADP",
+}
+
+
+# ------------------------
+# FUNCTIONS
+# ------------------------
+def _object_sentence(lex, rng):
+    """'Citizens defend the real freedom in Paris since 1987.'"""
+    noun_phrase = [rng.choice(lex["dets"]), lex["keyword"]]
+    adj = rng.choice(lex["adjs"])
+    noun_phrase.insert(2 if lex["adj_after_noun"] else 1, adj)
+    words = [rng.choice(lex["subjects"]), rng.choice(lex["verbs"]), *noun_phrase]
+    return words
+
+
+def _subject_sentence(lex, rng):
+    """'The real freedom is important in Paris since 1987.'"""
+    noun_phrase = [lex["article"], lex["keyword"]]
+    adj = rng.choice(lex["adjs"])
+    noun_phrase.insert(2 if lex["adj_after_noun"] else 1, adj)
+    return [*noun_phrase, lex["copula"], rng.choice(lex["preds"])]
+
+
+def synthesize_sentence(language: str, rng: random.Random) -> str:
+    """Build one templated sentence containing the language's keyword."""
+    lex = LEXICONS[language]
+    build = _object_sentence if rng.random() < 0.6 else _subject_sentence
+    words = build(lex, rng)
+    words += [rng.choice(lex["place_preps"]), rng.choice(PLACES), rng.choice(lex["time_preps"]), str(rng.choice(YEARS))]
+    sentence = " ".join(words) + "."
+    return sentence[0].upper() + sentence[1:]
+
+
+def _near_duplicate(sentence: str, rng: random.Random) -> str:
+    """Return a casing/punctuation variant that embedding dedup should catch."""
+    variant = rng.choice(["upper", "lower", "exclaim"])
+    if variant == "upper":
+        return sentence.upper()
+    if variant == "lower":
+        return sentence.lower()
+    return sentence.rstrip(".") + "!"
+
+
+def generate_corpus(n_sentences: int, seed=0, dup_rate=0.05, near_dup_rate=0.05, seed_path=SEED_PATH) -> pd.DataFrame:
+    """Generate a multilingual corpus shaped like scraped_freedom_sentences.csv.
+
+    The hand-written test sentences are included first, then templated
+    sentences are added round-robin across languages. A share of rows are
+    exact or near duplicates of earlier rows so the dedup stages have work.
+    """
+    rng = random.Random(seed)
+    seeds = pd.read_csv(seed_path)
+    rows = seeds.to_dict("records")[:n_sentences]
+    languages = list(LEXICONS)
+
+    while len(rows) < n_sentences:
+        roll = rng.random()
+        if roll < dup_rate:
+            rows.append(dict(rng.choice(rows)))
+        elif roll < dup_rate + near_dup_rate:
+            original = rng.choice(rows)
+            rows.append({**original, "sentence": _near_duplicate(original["sentence"], rng)})
+        else:
+            language = languages[len(rows) % len(languages)]
+            rows.append({
+                "language": language,
+                "source_word": LEXICONS[language]["keyword"],
+                "sentence": synthesize_sentence(language, rng),
+            })
+
+    return pd.DataFrame(rows, columns=["language", "source_word", "sentence"])
+
+
+# ------------------------
+# MAIN EXECUTION
+# ------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic scraped-sentences CSV.")
+    parser.add_argument("--size", type=int, default=100_000, help="Number of sentences to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", default="./outputs/synthetic_freedom_sentences.csv", help="CSV path to write")
+    args = parser.parse_args()
+
+    df = generate_corpus(args.size, seed=args.seed)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8")
+    print(f"Saved {len(df)} synthetic sentences to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
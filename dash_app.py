@@ -1,74 +1,185 @@
+import json
+import threading
+from pathlib import Path
+
 import pandas as pd
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State
 import plotly.express as px
 import os
 
-# Load and prepare data
-df = pd.read_csv('outputs/freedom_viz_ready.csv')
-df = df[df['english_coword'] != 'freedom'] # Removing freedom entries
-df_agg = df.groupby(['english_coword', 'lang_name'])['count'].first().reset_index()
+VIZ_PATH = Path('outputs/freedom_viz_ready.csv')
+DELTA_DIR = Path('outputs/viz_deltas')  # written by prep_viz_data.py
+DELTA_POLL_SECONDS = 5
+HEATMAP_WORDS = 10
+HEATMAP_LANGUAGES = 10
+BAR_WORDS = 25
+LANGUAGE_BAR_WORDS = 10
+
+
+class VizState:
+    """Aggregated counts (fixed once published) plus figures built lazily from them."""
+
+    def __init__(self, counts, totals, languages, seq, figures=None):
+        self.counts = counts  # (english_coword, lang_name) -> count
+        self.totals = totals  # english_coword -> count summed over languages
+        self.languages = languages
+        self.seq = seq
+        self.figures = figures or {}
+        self._top_words = None
+
+    @property
+    def top_words(self):
+        """Total count per co-word across languages, highest first."""
+        if self._top_words is None:
+            self._top_words = pd.Series(self.totals, dtype='int64').sort_index().sort_values(ascending=False)
+        return self._top_words
+
+    def language_counts(self, lang):
+        counts = {word: count for (word, lang_name), count in self.counts.items() if lang_name == lang}
+        return pd.Series(counts, dtype='int64').sort_index()
+
+
+def load_state():
+    """Start from prep's snapshot when there is one, otherwise aggregate the viz CSV."""
+    snapshot_path = DELTA_DIR / 'snapshot.json'
+    if snapshot_path.exists():
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        rows = [(word, lang, count) for word, lang, count in snapshot['counts']]
+        seq = snapshot['seq']
+    else:
+        df = pd.read_csv(VIZ_PATH)
+        df = df[df['english_coword'] != 'freedom'] # Removing freedom entries
+        df_agg = df.groupby(['english_coword', 'lang_name'])['count'].first().reset_index()
+        rows = df_agg.itertuples(index=False, name=None)
+        seq = 0
+
+    counts = {}
+    totals = {}
+    languages = []
+    for word, lang, count in rows:
+        counts[(word, lang)] = int(count)
+        totals[word] = totals.get(word, 0) + int(count)
+        if lang not in languages:
+            languages.append(lang)
+    return VizState(counts, totals, languages, seq)
+
+
+def _affects_top(state, totals, changed_words, n):
+    """Whether changing these words can alter the top-n co-words by total count."""
+    top = state.top_words.head(n)
+    if len(top) < n or changed_words & set(top.index):
+        return True
+    return any(totals.get(word, 0) >= top.iloc[-1] for word in changed_words)
+
+
+def apply_delta(state, delta):
+    """Return a new VizState with the delta applied, keeping figures it cannot have changed."""
+    counts = dict(state.counts)
+    totals = dict(state.totals)
+    languages = list(state.languages)
+    changed_words, changed_langs = set(), set()
+    for word, lang, change in delta['changes']:
+        old_count = counts.get((word, lang), 0)
+        count = max(old_count + change, 0)
+        if count > 0:
+            counts[(word, lang)] = count
+        else:
+            counts.pop((word, lang), None)
+        totals[word] = totals.get(word, 0) + count - old_count
+        if totals[word] <= 0:
+            totals.pop(word)
+        changed_words.add(word)
+        changed_langs.add(lang)
+        if lang not in languages:
+            languages.append(lang)
+
+    stale = {('lang', lang) for lang in changed_langs}
+    if _affects_top(state, totals, changed_words, HEATMAP_WORDS) or languages != state.languages:
+        stale.add('heatmap')
+    if _affects_top(state, totals, changed_words, BAR_WORDS):
+        stale.add('bar')
+    figures = {name: fig for name, fig in state.figures.items() if name not in stale}
+    return VizState(counts, totals, languages, delta['seq'], figures)
+
+
+_state = load_state()
+_state_lock = threading.Lock()
+
 
-# Find top words by total count across all languages
-top_words = df_agg.groupby('english_coword')['count'].sum().sort_values(ascending=False)
-top_word_list = top_words.index.tolist()
+def apply_pending_deltas():
+    """Apply any delta files newer than the current state and swap it in atomically."""
+    global _state
+    with _state_lock:
+        state = _state
+        for path in sorted(DELTA_DIR.glob('delta_*.json')):
+            if int(path.stem.split('_')[1]) <= state.seq:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                state = apply_delta(state, json.load(f))
+        _state = state
+    return state
+
+
+apply_pending_deltas()
 
-# Filter aggregated data to only include top words
-df_final = df_agg[df_agg['english_coword'].isin(top_word_list)]
 
 #! Heatmap
-heatmap_df = df_final.pivot(index='english_coword', columns='lang_name', values='count').fillna(0)
-heatmap_df['total'] = heatmap_df.sum(axis=1)
-heatmap_df = heatmap_df.sort_values('total', ascending=False).drop(columns='total')
-heatmap_subset = heatmap_df.iloc[:10, :10]
-heatmap_fig = px.imshow(
-    heatmap_subset,
-    labels=dict(x="Language", y="Co-Word", color="Frequency"),
-    x=heatmap_subset.columns,
-    y=heatmap_subset.index,
-    title="Top Co-Words by Total Frequency Across Languages",
-    aspect="auto",
-    color_continuous_scale="Teal"
-)
-heatmap_fig.update_xaxes(side="top")
+def build_heatmap(state):
+    words = state.top_words.index[:HEATMAP_WORDS]
+    languages = sorted(state.languages)[:HEATMAP_LANGUAGES]
+    heatmap_subset = pd.DataFrame(
+        [[float(state.counts.get((word, lang), 0)) for lang in languages] for word in words],
+        index=pd.Index(words, name='english_coword'),
+        columns=pd.Index(languages, name='lang_name'),
+    )
+    heatmap_fig = px.imshow(
+        heatmap_subset,
+        labels=dict(x="Language", y="Co-Word", color="Frequency"),
+        x=heatmap_subset.columns,
+        y=heatmap_subset.index,
+        title="Top Co-Words by Total Frequency Across Languages",
+        aspect="auto",
+        color_continuous_scale="Teal"
+    )
+    heatmap_fig.update_xaxes(side="top")
+    return heatmap_fig
+
 
 #! Barchart
-bar_fig_subset = top_words.head(25)
-bar_fig = px.bar(
-    x=bar_fig_subset.values[::-1],
-    y=bar_fig_subset.index[::-1],
-    orientation='h',
-    labels={'x': 'Total Frequency', 'y': 'Co-Words'},
-    title="Top Co-Words by Total Frequency",
-    color=bar_fig_subset.values[::-1],
-    color_continuous_scale="Teal" 
-)
-bar_fig.update_layout(
-    plot_bgcolor="#fcfbfb",
-    paper_bgcolor='white',
-    height=700
-)
-
-# Create separate bar charts for each language
-languages = df_agg['lang_name'].unique()
+def build_bar(state):
+    bar_fig_subset = state.top_words.head(BAR_WORDS)
+    bar_fig = px.bar(
+        x=bar_fig_subset.values[::-1],
+        y=bar_fig_subset.index[::-1],
+        orientation='h',
+        labels={'x': 'Total Frequency', 'y': 'Co-Words'},
+        title="Top Co-Words by Total Frequency",
+        color=bar_fig_subset.values[::-1],
+        color_continuous_scale="Teal" 
+    )
+    bar_fig.update_layout(
+        plot_bgcolor="#fcfbfb",
+        paper_bgcolor='white',
+        height=700
+    )
+    return bar_fig
+
 
 #! Bar charts for each language
-language_figs = {}
-for lang in languages:
-    # Filter data for this language
-    lang_data = df_agg[df_agg['lang_name'] == lang]
-    
+def build_language_bar(state, lang):
     # Get top 10 words for this language
-    top_10_lang = lang_data.nlargest(10, 'count')
+    top_10_lang = state.language_counts(lang).nlargest(LANGUAGE_BAR_WORDS)
     
     # Create bar chart for this language
     lang_fig = px.bar(
-        x=top_10_lang['count'][::-1],  # Reverse for descending order
-        y=top_10_lang['english_coword'][::-1],  # Reverse for descending order
+        x=top_10_lang.values[::-1],  # Reverse for descending order
+        y=top_10_lang.index[::-1],  # Reverse for descending order
         orientation='h',
         labels={'x': 'Frequency', 'y': 'Co-Words'},
         title=f"Top 10 Co-Words in {lang}",
-        color=top_10_lang['count'][::-1],
+        color=top_10_lang.values[::-1],
         color_continuous_scale="Teal"
     )
     
@@ -77,8 +188,19 @@ for lang in languages:
         paper_bgcolor='white',
         height=700  # Set consistent height
     )
-    
-    language_figs[lang] = lang_fig
+    return lang_fig
+
+
+def get_figure(state, name):
+    """Return a cached figure for this state, building it on first use."""
+    if name not in state.figures:
+        if name == 'heatmap':
+            state.figures[name] = build_heatmap(state)
+        elif name == 'bar':
+            state.figures[name] = build_bar(state)
+        else:
+            state.figures[name] = build_language_bar(state, name[1])
+    return state.figures[name]
 
 
 app = dash.Dash(__name__)
@@ -92,15 +214,26 @@ app.layout = html.Div([
         dcc.Tab(label='Bar charts for each language', value='tab-3'),
     ]),
     
-    html.Div(id='tab-content')
+    html.Div(id='tab-content'),
+    dcc.Store(id='data-version', data=_state.seq),
+    dcc.Interval(id='delta-poll', interval=DELTA_POLL_SECONDS * 1000)
 ])
 
+@app.callback(Output('data-version', 'data'),
+              Input('delta-poll', 'n_intervals'),
+              State('data-version', 'data'))
+def poll_deltas(_, version):
+    state = apply_pending_deltas()
+    return dash.no_update if state.seq == version else state.seq
+
 @app.callback(Output('tab-content', 'children'),
-              Input('tabs', 'value'))
-def render_content(tab):
+              Input('tabs', 'value'),
+              Input('data-version', 'data'))
+def render_content(tab, _version=None):
+    state = _state
     if tab == 'tab-1':
         return html.Div([
-            dcc.Graph(figure=heatmap_fig),
+            dcc.Graph(figure=get_figure(state, 'heatmap')),
             html.Div([
                 html.H2("Observations"),
                 html.B("This heatmap shows the frequency of co-words across different languages. Darker colors indicate higher frequency of usage."),
@@ -117,7 +250,7 @@ def render_content(tab):
         ])
     elif tab == 'tab-2':
         return html.Div([
-            dcc.Graph(figure=bar_fig),
+            dcc.Graph(figure=get_figure(state, 'bar')),
             html.Div([
                 html.H2("Observations"),
                 html.B("This bar chart displays the most frequently used co-words with 'freedom' across all languages combined."),
@@ -137,9 +270,9 @@ def render_content(tab):
             html.H2("Top Words by Language"),
             html.Div([
                 html.Div([
-                    dcc.Graph(figure=language_figs[lang])
+                    dcc.Graph(figure=get_figure(state, ('lang', lang)))
                 ], style={'width': '45%', 'display': 'inline-block'})
-                for lang in languages
+                for lang in state.languages
             ]),
             html.Div([
             html.B("This table shows the raw aggregated data used to create the visualizations. Each row represents a unique co-word and language combination with its frequency count."),